@@ -1,50 +1,131 @@
 from fastmcp import FastMCP
-from fastmcp.server.middleware import Middleware, MiddlewareContext
-from fastmcp.server.dependencies import get_http_headers
-from mcp import McpError
-from mcp.types import ErrorData
+from starlette.middleware import Middleware
 import datetime
-import pytz
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError, available_timezones
+import hmac
 import os
-from typing import Dict, Union, Optional, Literal
-from datetime import datetime, timedelta
+import re
+import time
+from typing import Any, Dict, List, Tuple, Union, Optional, Literal
+from datetime import datetime, timedelta, timezone as dt_timezone, tzinfo
 import asyncio
+from functools import lru_cache
 
 
 API_KEY = os.environ.get("MCP_API_KEY")
 
-mcp = FastMCP(
+
+class ApiKeyMiddleware:
+    """
+    Pure ASGI middleware that rejects HTTP requests without a matching
+    X-API-Key header.
+    
+    Reads the raw header list from the ASGI scope instead of building a
+    Request/Response pair per call, and compares the key in constant time.
+    Installed by AuthenticatedFastMCP when API_KEY is set.
+    """
+    def __init__(self, app, api_key: str):
+        self.app = app
+        self.api_key = api_key.encode()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        for name, value in scope["headers"]:
+            if name == b"x-api-key":
+                if hmac.compare_digest(value, self.api_key):
+                    return await self.app(scope, receive, send)
+                break
+
+        await send({
+            "type": "http.response.start",
+            "status": 401,
+            "headers": [(b"content-type", b"application/json")],
+        })
+        await send({
+            "type": "http.response.body",
+            "body": b'{"error": "Invalid or missing API Key"}',
+        })
+
+
+def _with_api_key(middleware: Optional[List[Middleware]]) -> Optional[List[Middleware]]:
+    """Prepend ApiKeyMiddleware to an ASGI middleware list when API_KEY is set."""
+    if not API_KEY:
+        return middleware
+    return [Middleware(ApiKeyMiddleware, api_key=API_KEY), *(middleware or [])]
+
+
+class AuthenticatedFastMCP(FastMCP):
+    """
+    FastMCP server whose HTTP apps always include the API key check.
+    
+    Every HTTP entry point builds its Starlette app through http_app() (or the
+    deprecated sse_app()), so hooking them here also protects servers started
+    with `fastmcp run` or mounted from mcp.http_app() in another ASGI host.
+    """
+    def http_app(self, path=None, middleware=None, **kwargs):
+        return super().http_app(path=path, middleware=_with_api_key(middleware), **kwargs)
+
+    def sse_app(self, path=None, message_path=None, middleware=None):
+        return super().sse_app(path=path, message_path=message_path, middleware=_with_api_key(middleware))
+
+
+mcp = AuthenticatedFastMCP(
     name="Perception of Passage of Time",
     instructions='''You now have access to current_datetime() and can pass along an optional timezone parameter (defaults to NYC). You should call this at the start of every response, so you can get an appreciation for the user's passage of time.
 
 To help you make computations about time, you have multiple other tools:
 - time_difference(): Calculate difference between two timestamps
+- time_difference_batch(): Calculate differences for many timestamp pairs at once
 - time_since(): Calculate time elapsed since a timestamp
 - parse_timestamp(): Convert timestamp to multiple formats
 - add_time(): Add/subtract duration from a timestamp
 - timestamp_context(): Get contextual info about a timestamp
 - format_duration(): Format seconds into readable text
+- batch(): Run several of the tools above in one call
 
 IMPORTANT: All timestamps must use format "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD" for dates only. 
 Examples: "2024-01-15 14:30:00" or "2024-01-15". This ensures no ambiguity in parsing.'''
 )
 
 
-class ApiKeyMiddleware(Middleware):
-    async def on_request(self, context: MiddlewareContext, call_next):
-        if not API_KEY:
-            return await call_next(context)
-
-        headers = get_http_headers()
-        client_api_key = headers.get("x-api-key")
+_UTC = dt_timezone.utc
 
-        if not client_api_key or client_api_key != API_KEY:
-            raise McpError(ErrorData(code=-32000, message="Invalid or missing API Key"))
-        
-        return await call_next(context)
+@lru_cache(maxsize=512)
+def _get_tz(name: str) -> tzinfo:
+    """
+    Return the ZoneInfo for `name`, cached across calls.
+    
+    "UTC" maps to the fixed-offset stdlib timezone.utc, which has no
+    transition table to consult. Names are matched case-insensitively as a
+    fallback (e.g. "utc"). Raises ZoneInfoNotFoundError for unknown names
+    (not cached).
+    """
+    if name == "UTC":
+        return _UTC
+    try:
+        return ZoneInfo(name)
+    except ZoneInfoNotFoundError:
+        canonical = _tz_names_by_lower().get(name.lower())
+        if canonical is None:
+            raise
+        return _get_tz(canonical)
 
-mcp.add_middleware(ApiKeyMiddleware())
+@lru_cache(maxsize=1)
+def _tz_names_by_lower() -> Dict[str, str]:
+    """Map lower-cased IANA names to their canonical spelling, built on first miss."""
+    return {name.lower(): name for name in available_timezones()}
 
+# Load the most commonly requested zones at import, so the first request for
+# each does not pay for reading its tzdata file
+for _name in ("America/New_York", "America/Chicago", "America/Los_Angeles",
+              "Europe/London", "Europe/Berlin", "Asia/Tokyo", "Australia/Sydney"):
+    try:
+        _get_tz(_name)
+    except ZoneInfoNotFoundError:
+        pass
+del _name
 
 def parse_standard_timestamp(timestamp_str: str, timezone: str = "America/New_York") -> datetime:
     """
@@ -53,36 +134,82 @@ def parse_standard_timestamp(timestamp_str: str, timezone: str = "America/New_Yo
     
     Raises ValueError with clear message if format is invalid.
     """
-    tz = pytz.timezone(timezone)
-    timestamp_str = timestamp_str.strip()
+    return _parse_cached(timestamp_str.strip(), timezone)
+
+@lru_cache(maxsize=4096)
+def _parse_cached(timestamp_str: str, timezone: str) -> datetime:
+    """
+    Memoized body of parse_standard_timestamp(), keyed on the stripped string.
     
-    try:
-        dt = datetime.strptime(timestamp_str, "%Y-%m-%d %H:%M:%S")
-        return tz.localize(dt)
-    except ValueError:
-        pass
+    Aware datetimes are immutable, so callers can safely share the result.
+    """
+    tz = _get_tz(timezone)
     
     try:
-        dt = datetime.strptime(timestamp_str, "%Y-%m-%d")
-        return tz.localize(dt)
+        dt = _parse_fixed(timestamp_str, tz) or _parse_lenient(timestamp_str, tz)
     except ValueError:
-        pass
+        dt = None
     
-    try:
-        parts = timestamp_str.rsplit(' ', 2)
-        if len(parts) == 3 and len(parts[2]) <= 4:
-            dt_str = f"{parts[0]} {parts[1]}"
-            dt = datetime.strptime(dt_str, "%Y-%m-%d %H:%M:%S")
-            return tz.localize(dt)
-    except ValueError:
-        pass
+    if dt is None:
+        raise ValueError(
+            f"Invalid timestamp format: '{timestamp_str}'. "
+            f"Expected format: 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'. "
+            f"Examples: '2024-01-15 14:30:00' or '2024-01-15'"
+        )
+    
+    return dt
+
+def _parse_fixed(s: str, tz: tzinfo) -> Optional[datetime]:
+    """
+    Fast path for the exact "YYYY-MM-DD" and "YYYY-MM-DD HH:MM:SS" layouts,
+    optionally followed by a timezone abbreviation (which is ignored). The
+    result is built directly in tz.
+    
+    Returns None if the string does not have that shape, and raises ValueError
+    if it does but a field is out of range (e.g. "2024-02-30").
+    """
+    n = len(s)
+    if 20 <= n <= 24 and s[19] == " " and " " not in s[20:]:
+        n = 19
+    if n != 10 and n != 19:
+        return None
+    
+    if not (s[4] == "-" and s[7] == "-"
+            and s[0:4].isdigit() and s[5:7].isdigit() and s[8:10].isdigit()):
+        return None
+    if n == 10:
+        return datetime(int(s[0:4]), int(s[5:7]), int(s[8:10]), tzinfo=tz)
     
-    raise ValueError(
-        f"Invalid timestamp format: '{timestamp_str}'. "
-        f"Expected format: 'YYYY-MM-DD HH:MM:SS' or 'YYYY-MM-DD'. "
-        f"Examples: '2024-01-15 14:30:00' or '2024-01-15'"
+    if not (s[10] == " " and s[13] == ":" and s[16] == ":"
+            and s[11:13].isdigit() and s[14:16].isdigit() and s[17:19].isdigit()):
+        return None
+    return datetime(
+        int(s[0:4]), int(s[5:7]), int(s[8:10]),
+        int(s[11:13]), int(s[14:16]), int(s[17:19]), tzinfo=tz
     )
 
+# Same shapes strptime accepted: unpadded fields, any whitespace between date
+# and time, and an optional trailing timezone abbreviation (ignored)
+_TIMESTAMP_RE = re.compile(
+    r"(\d{4})-(\d{1,2})-(\d{1,2}| [1-9])"
+    r"(?:\s+(\d{1,2}):(\d{1,2}):(\d{1,2})(?: \S{1,4})?)?"
+)
+
+def _parse_lenient(timestamp_str: str, tz: tzinfo) -> Optional[datetime]:
+    """
+    Slow path for inputs _parse_fixed() does not recognize, such as
+    non-zero-padded fields ("2024-1-5 9:05:00").
+    """
+    match = _TIMESTAMP_RE.fullmatch(timestamp_str)
+    if match is None:
+        return None
+    fields = [int(field) for field in match.groups() if field is not None]
+    return datetime(*fields, tzinfo=tz)
+
+# Zone -> (epoch second, formatted string) of the last current_datetime() call.
+# The output only has 1s resolution, and there is one entry per distinct zone.
+_now_cache: Dict[tzinfo, Tuple[int, str]] = {}
+
 @mcp.tool()
 def current_datetime(timezone: str = "America/New_York") -> str:
     """
@@ -97,12 +224,112 @@ def current_datetime(timezone: str = "America/New_York") -> str:
         A formatted date and time string in format: YYYY-MM-DD HH:MM:SS TZ
     """
     try:
-        tz = pytz.timezone(timezone)
-        now = datetime.now(tz)
-        return now.strftime("%Y-%m-%d %H:%M:%S %Z")
-    except pytz.exceptions.UnknownTimeZoneError:
+        tz = _get_tz(timezone)
+        second = int(time.time())
+        cached = _now_cache.get(tz)
+        if cached is not None and cached[0] == second:
+            return cached[1]
+        
+        now = datetime.fromtimestamp(second, tz)
+        result = (
+            f"{now.year:04d}-{now.month:02d}-{now.day:02d} "
+            f"{now.hour:02d}:{now.minute:02d}:{now.second:02d} {now.tzname()}"
+        )
+        
+        _now_cache[tz] = (second, result)
+        return result
+    except (ZoneInfoNotFoundError, ValueError):
         return f"Error: Unknown timezone '{timezone}'. Please use a valid timezone name like 'UTC', 'US/Pacific', or 'Europe/London'."
 
+_PLURAL = {True: "s", False: ""}
+
+# Seconds per unit, shared by time_difference and add_time
+_UNIT_CONVERSIONS = {
+    "seconds": 1,
+    "minutes": 60,
+    "hours": 3600,
+    "days": 86400,
+    "weeks": 604800
+}
+_UNIT_TIMEDELTAS = {unit: timedelta(seconds=secs) for unit, secs in _UNIT_CONVERSIONS.items()}
+# time_difference only reports up to days; "weeks" is an add_time unit
+_TIME_DIFFERENCE_UNITS = {unit: _UNIT_CONVERSIONS[unit] for unit in ("seconds", "minutes", "hours", "days")}
+
+def _split_seconds(total: int) -> Tuple[int, int, int, int]:
+    """Split a non-negative whole number of seconds into (days, hours, minutes, seconds)."""
+    days, rem = divmod(total, 86400)
+    hours, rem = divmod(rem, 3600)
+    minutes, secs = divmod(rem, 60)
+    return days, hours, minutes, secs
+
+# Pre-rendered "N unit(s)" strings for every value a split duration can hold
+# below one day; only the day count still needs formatting per call
+_HOURS_TEXT = tuple(f"{n} hour{_PLURAL[n != 1]}" for n in range(24))
+_MINUTES_TEXT = tuple(f"{n} minute{_PLURAL[n != 1]}" for n in range(60))
+_SECONDS_TEXT = tuple(f"{n} second{_PLURAL[n != 1]}" for n in range(60))
+
+def _format_timedelta(days: int, hours: int, minutes: int, secs: int) -> str:
+    """
+    Format a split non-negative duration as e.g. "3 hours, 10 minutes",
+    omitting zero-valued units.
+    """
+    if not (days or hours or minutes):
+        return _SECONDS_TEXT[secs]
+    
+    parts = []
+    if days > 0:
+        parts.append(f"{days} day{_PLURAL[days != 1]}")
+    if hours > 0:
+        parts.append(_HOURS_TEXT[hours])
+    if minutes > 0:
+        parts.append(_MINUTES_TEXT[minutes])
+    if secs > 0:
+        parts.append(_SECONDS_TEXT[secs])
+    
+    return ", ".join(parts)
+
+def _time_difference_dt(
+    dt1: datetime,
+    dt2: datetime,
+    unit: str = "auto"
+) -> Dict[str, Union[int, float, str, bool]]:
+    """
+    Shared body of time_difference() for already-parsed aware datetimes.
+    """
+    # `-` on datetimes sharing a tzinfo compares wall clocks, so correct by the
+    # change in UTC offset to stay exact across DST; mixed zones already are.
+    delta = dt2 - dt1
+    if dt1.tzinfo is dt2.tzinfo:
+        delta -= dt2.utcoffset() - dt1.utcoffset()
+    total_seconds = delta.total_seconds()
+    is_negative = total_seconds < 0
+    
+    # timedelta already holds whole days and seconds-within-day as ints
+    abs_delta = -delta if is_negative else delta
+    hours, rem = divmod(abs_delta.seconds, 3600)
+    minutes, secs = divmod(rem, 60)
+    
+    formatted = _format_timedelta(abs_delta.days, hours, minutes, secs)
+    if is_negative:
+        formatted = f"-{formatted}"
+    
+    result = {
+        "seconds": total_seconds,
+        "formatted": formatted,
+        "is_negative": is_negative
+    }
+    
+    if unit != "auto":
+        result["requested_unit"] = total_seconds / _TIME_DIFFERENCE_UNITS[unit]
+    
+    return result
+
+# time_difference result for two identical timestamps
+_ZERO_DIFFERENCE = { "seconds": 0.0, "formatted": "0 seconds", "is_negative": False }
+
+# Fields each tool returns alongside "error", shared by its except branches
+_TIME_DIFFERENCE_ERROR = { "seconds": 0, "formatted": "Error", "is_negative": False }
+
 @mcp.tool()
 def time_difference(
     timestamp1: str, 
@@ -130,56 +357,70 @@ def time_difference(
     """
     try:
         dt1 = parse_standard_timestamp(timestamp1, timezone)
-        dt2 = parse_standard_timestamp(timestamp2, timezone)
-        
-        delta = dt2 - dt1
-        total_seconds = delta.total_seconds()
-        is_negative = total_seconds < 0
-        abs_seconds = abs(total_seconds)
-        
-        def format_timedelta(seconds):
-            days = int(seconds // 86400)
-            hours = int((seconds % 86400) // 3600)
-            minutes = int((seconds % 3600) // 60)
-            secs = int(seconds % 60)
-            
-            parts = []
-            if days > 0:
-                parts.append(f"{days} day{'s' if days != 1 else ''}")
-            if hours > 0:
-                parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-            if minutes > 0:
-                parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-            if secs > 0 or not parts:
-                parts.append(f"{secs} second{'s' if secs != 1 else ''}")
-            
-            return ", ".join(parts)
-        
-        formatted = format_timedelta(abs_seconds)
-        if is_negative:
-            formatted = f"-{formatted}"
-        
-        result = {
-            "seconds": total_seconds,
-            "formatted": formatted,
-            "is_negative": is_negative
-        }
+        if timestamp2 == timestamp1:
+            # Still parsed once above, so invalid input keeps its error
+            result = dict(_ZERO_DIFFERENCE)
+            if unit != "auto":
+                if unit not in _TIME_DIFFERENCE_UNITS:
+                    raise KeyError(unit)
+                result["requested_unit"] = 0.0
+            return result
         
-        if unit != "auto":
-            unit_conversions = {
-                "seconds": 1,
-                "minutes": 60,
-                "hours": 3600,
-                "days": 86400
-            }
-            result["requested_unit"] = total_seconds / unit_conversions[unit]
+        dt2 = parse_standard_timestamp(timestamp2, timezone)
+        return _time_difference_dt(dt1, dt2, unit)
         
-        return result
+    except ValueError as e:
+        return { "error": str(e), **_TIME_DIFFERENCE_ERROR }
+    except Exception as e:
+        return { "error": f"Unexpected error: {str(e)}", **_TIME_DIFFERENCE_ERROR }
+
+_TIME_DIFFERENCE_BATCH_MAX = 1000
+_TIME_DIFFERENCE_BATCH_ERROR = { "seconds": [] }
+
+@mcp.tool()
+def time_difference_batch(
+    timestamps1: List[str],
+    timestamps2: List[str],
+    timezone: str = "America/New_York"
+) -> Dict[str, Union[List[float], str]]:
+    """
+    Calculate the time difference for many pairs of timestamps in one call.
+    
+    Timestamps must be in format: "YYYY-MM-DD HH:MM:SS" or "YYYY-MM-DD"
+    
+    Args:
+        timestamps1: First timestamp of each pair (up to 1000)
+        timestamps2: Second timestamp of each pair, same length as timestamps1
+        timezone: Timezone for parsing ambiguous timestamps
+    
+    Returns:
+        Dictionary containing:
+        - seconds: timestamps2[i] - timestamps1[i] in seconds, one per pair in order
+    """
+    try:
+        if len(timestamps1) != len(timestamps2):
+            raise ValueError(
+                f"Timestamp lists differ in length: {len(timestamps1)} and {len(timestamps2)}"
+            )
+        if len(timestamps1) > _TIME_DIFFERENCE_BATCH_MAX:
+            raise ValueError(
+                f"Too many timestamp pairs: {len(timestamps1)} (maximum is {_TIME_DIFFERENCE_BATCH_MAX})"
+            )
+        
+        # Epoch seconds are absolute, so this is exact across DST changes too
+        seconds = [
+            parse_standard_timestamp(ts2, timezone).timestamp()
+            - parse_standard_timestamp(ts1, timezone).timestamp()
+            for ts1, ts2 in zip(timestamps1, timestamps2)
+        ]
+        return { "seconds": seconds }
         
     except ValueError as e:
-        return { "error": str(e), "seconds": 0, "formatted": "Error", "is_negative": False }
+        return { "error": str(e), **_TIME_DIFFERENCE_BATCH_ERROR }
     except Exception as e:
-        return { "error": f"Unexpected error: {str(e)}", "seconds": 0, "formatted": "Error", "is_negative": False }
+        return { "error": f"Unexpected error: {str(e)}", **_TIME_DIFFERENCE_BATCH_ERROR }
+
+_TIME_SINCE_ERROR = { "seconds": 0, "formatted": "Error", "context": "unknown" }
 
 @mcp.tool()
 def time_since(
@@ -202,20 +443,16 @@ def time_since(
         - context: Contextual description (e.g., "earlier today", "yesterday")
     """
     try:
-        tz = pytz.timezone(timezone)
-        now = datetime.now(tz)
-        now_str = now.strftime("%Y-%m-%d %H:%M:%S")
-        
-        diff = time_difference(timestamp, now_str, unit="auto", timezone=timezone)
+        tz = _get_tz(timezone)
+        dt = parse_standard_timestamp(timestamp, timezone)
+        # Truncate to whole seconds, matching the resolution of the timestamps we accept
+        now = datetime.now(tz).replace(microsecond=0)
         
-        if "error" in diff:
-            return { "error": diff.get("error", "Error"), "seconds": 0, "formatted": "Error", "context": "unknown" }
+        diff = _time_difference_dt(dt, now, "auto")
         
         seconds = diff["seconds"]
         abs_seconds = abs(seconds)
         
-        dt = parse_standard_timestamp(timestamp, timezone)
-        
         context = ""
         if seconds < 0: context = "in the future"
         elif abs_seconds < 60: context = "just now"
@@ -230,9 +467,11 @@ def time_since(
         return { "seconds": seconds, "formatted": formatted, "context": context }
         
     except ValueError as e:
-        return { "error": str(e), "seconds": 0, "formatted": "Error", "context": "unknown" }
+        return { "error": str(e), **_TIME_SINCE_ERROR }
     except Exception as e:
-        return { "error": f"Unexpected error: {str(e)}", "seconds": 0, "formatted": "Error", "context": "unknown" }
+        return { "error": f"Unexpected error: {str(e)}", **_TIME_SINCE_ERROR }
+
+_PARSE_TIMESTAMP_ERROR = { "iso": "", "unix": "", "human": "Error" }
 
 @mcp.tool()
 def parse_timestamp(
@@ -264,24 +503,33 @@ def parse_timestamp(
         parse_tz = source_timezone or target_timezone
         dt = parse_standard_timestamp(timestamp, parse_tz)
         
-        if source_timezone and source_timezone != target_timezone:
-            tgt_tz = pytz.timezone(target_timezone)
+        # _get_tz is cached, so the same zone name in any case gives the same object
+        tgt_tz = _get_tz(target_timezone)
+        if dt.tzinfo is not tgt_tz:
             dt = dt.astimezone(tgt_tz)
         
+        # One strftime pass for both locale-dependent fields
+        day_of_week, _, human = dt.strftime("%A\t%B %d, %Y at %I:%M %p %Z").partition("\t")
+        
         return {
             "iso": dt.isoformat(),
             "unix": str(int(dt.timestamp())),
-            "human": dt.strftime("%B %d, %Y at %I:%M %p %Z"),
+            "human": human,
             "timezone": target_timezone,
-            "day_of_week": dt.strftime("%A"),
-            "date": dt.strftime("%Y-%m-%d"),
-            "time": dt.strftime("%H:%M:%S")
+            "day_of_week": day_of_week,
+            "date": f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}",
+            "time": f"{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
         }
         
     except ValueError as e:
-        return { "error": str(e), "iso": "", "unix": "", "human": "Error" }
+        return { "error": str(e), **_PARSE_TIMESTAMP_ERROR }
     except Exception as e:
-        return { "error": f"Unexpected error: {str(e)}", "iso": "", "unix": "", "human": "Error" }
+        return { "error": f"Unexpected error: {str(e)}", **_PARSE_TIMESTAMP_ERROR }
+
+# Calendar-day offset from today -> relative label, for add_time and timestamp_context
+_RELATIVE_DAY = {0: "today", 1: "tomorrow", -1: "yesterday"}
+
+_ADD_TIME_ERROR = { "result": "Error" }
 
 @mcp.tool()
 def add_time(
@@ -308,34 +556,55 @@ def add_time(
         - description: Natural language description (e.g., "tomorrow at 3:00 PM")
     """
     try:
-        tz = pytz.timezone(timezone)
+        tz = _get_tz(timezone)
         dt = parse_standard_timestamp(timestamp, timezone)
         
         is_date_only = ":" not in timestamp
         
-        delta = timedelta(**{unit: duration})
+        step = _UNIT_TIMEDELTAS.get(unit)
+        if step is None:
+            raise ValueError(f"Invalid unit: {unit}")
         
-        result_dt = dt + delta
+        result_dt = dt + step * duration if duration else dt
         
         now = datetime.now(tz)
-        days_diff = (result_dt.date() - now.date()).days
-        
-        if days_diff == 0: day_desc = "today"
-        elif days_diff == 1: day_desc = "tomorrow"
-        elif days_diff == -1: day_desc = "yesterday"
-        else: day_desc = result_dt.strftime("%B %d, %Y")
+        days_diff = result_dt.toordinal() - now.toordinal()
+        day_desc = _RELATIVE_DAY.get(days_diff) or result_dt.strftime("%B %d, %Y")
         
         time_desc = result_dt.strftime("%I:%M %p").lstrip("0")
         description = f"{day_desc} at {time_desc}" if not is_date_only else day_desc
         
-        result_str = result_dt.strftime("%Y-%m-%d" if is_date_only else "%Y-%m-%d %H:%M:%S")
+        # Naive date()/time() isoformat skips the utcoffset() lookup
+        result_str = result_dt.date().isoformat()
+        if not is_date_only:
+            result_str += " " + result_dt.time().isoformat("seconds")
         
         return { "result": result_str, "iso": result_dt.isoformat(), "description": description }
         
     except ValueError as e:
-        return { "error": str(e), "result": "Error" }
+        return { "error": str(e), **_ADD_TIME_ERROR }
     except Exception as e:
-        return { "error": f"Unexpected error: {str(e)}", "result": "Error" }
+        return { "error": f"Unexpected error: {str(e)}", **_ADD_TIME_ERROR }
+
+def _time_of_day_for_hour(hour: int) -> str:
+    if 5 <= hour < 9: return "early_morning"
+    elif 9 <= hour < 12: return "morning"
+    elif 12 <= hour < 17: return "afternoon"
+    elif 17 <= hour < 21: return "evening"
+    else: return "late_night"
+
+def _activity_for_hour(hour: int) -> Optional[str]:
+    """None marks hours whose activity depends on business hours (work vs leisure)."""
+    if 6 <= hour < 9: return "commute_time"
+    elif 12 <= hour < 13: return "lunch_time"
+    elif 17 <= hour < 19: return "commute_time"
+    elif 19 <= hour < 21: return "dinner_time"
+    elif 22 <= hour or hour < 6: return "sleeping_time"
+    else: return None
+
+# Indexed by hour (0-23), so timestamp_context does a single lookup per field
+_TIME_OF_DAY = tuple(_time_of_day_for_hour(hour) for hour in range(24))
+_ACTIVITY_BY_HOUR = tuple(_activity_for_hour(hour) for hour in range(24))
 
 @mcp.tool()
 def timestamp_context(
@@ -362,33 +631,20 @@ def timestamp_context(
         - relative_day: "today", "yesterday", "tomorrow", or None
     """
     try:
-        tz = pytz.timezone(timezone)
+        tz = _get_tz(timezone)
         dt = parse_standard_timestamp(timestamp, timezone)
         now = datetime.now(tz)
         hour = dt.hour
         
-        if 5 <= hour < 9: time_of_day = "early_morning"
-        elif 9 <= hour < 12: time_of_day = "morning"
-        elif 12 <= hour < 17: time_of_day = "afternoon"
-        elif 17 <= hour < 21: time_of_day = "evening"
-        else: time_of_day = "late_night"
+        time_of_day = _TIME_OF_DAY[hour]
         
         day_of_week = dt.strftime("%A")
         is_weekend = dt.weekday() >= 5
         is_business_hours = (not is_weekend and 9 <= hour < 17)
         
-        if 6 <= hour < 9: typical_activity = "commute_time"
-        elif 12 <= hour < 13: typical_activity = "lunch_time"
-        elif 17 <= hour < 19: typical_activity = "commute_time"
-        elif 19 <= hour < 21: typical_activity = "dinner_time"
-        elif 22 <= hour or hour < 6: typical_activity = "sleeping_time"
-        else: typical_activity = "work_time" if is_business_hours else "leisure_time"
+        typical_activity = _ACTIVITY_BY_HOUR[hour] or ("work_time" if is_business_hours else "leisure_time")
         
-        days_diff = (dt.date() - now.date()).days
-        if days_diff == 0: relative_day = "today"
-        elif days_diff == -1: relative_day = "yesterday"
-        elif days_diff == 1: relative_day = "tomorrow"
-        else: relative_day = None
+        relative_day = _RELATIVE_DAY.get(dt.toordinal() - now.toordinal())
         
         return {
             "time_of_day": time_of_day,
@@ -404,6 +660,30 @@ def timestamp_context(
     except Exception as e:
         return { "error": f"Unexpected error: {str(e)}" }
 
+@lru_cache(maxsize=1024)
+def _format_duration_cached(total: int, style: str) -> str:
+    """
+    Memoized body of format_duration() for a non-negative whole number of
+    seconds; the sign is applied by the caller.
+    """
+    days, hours, minutes, secs = _split_seconds(total)
+    
+    if style == "full":
+        return _format_timedelta(days, hours, minutes, secs)
+    elif style == "compact":
+        parts = []
+        if days > 0: parts.append(f"{days}d")
+        if hours > 0: parts.append(f"{hours}h")
+        if minutes > 0: parts.append(f"{minutes}m")
+        if secs > 0 or not parts: parts.append(f"{secs}s")
+        return " ".join(parts)
+    elif style == "minimal":
+        if days > 0: return f"{days}:{hours:02d}:{minutes:02d}:{secs:02d}"
+        elif hours > 0: return f"{hours}:{minutes:02d}:{secs:02d}"
+        else: return f"{minutes}:{secs:02d}"
+    else:
+        raise ValueError(f"Invalid style: {style}")
+
 @mcp.tool()
 def format_duration(
     seconds: Union[int, float],
@@ -427,39 +707,62 @@ def format_duration(
         is_negative = seconds < 0
         abs_seconds = abs(seconds)
         
-        days = int(abs_seconds // 86400)
-        hours = int((abs_seconds % 86400) // 3600)
-        minutes = int((abs_seconds % 3600) // 60)
-        secs = int(abs_seconds % 60)
-        
-        if style == "full":
-            parts = []
-            if days > 0: parts.append(f"{days} day{'s' if days != 1 else ''}")
-            if hours > 0: parts.append(f"{hours} hour{'s' if hours != 1 else ''}")
-            if minutes > 0: parts.append(f"{minutes} minute{'s' if minutes != 1 else ''}")
-            if secs > 0 or not parts: parts.append(f"{secs} second{'s' if secs != 1 else ''}")
-            result = ", ".join(parts)
-        elif style == "compact":
-            parts = []
-            if days > 0: parts.append(f"{days}d")
-            if hours > 0: parts.append(f"{hours}h")
-            if minutes > 0: parts.append(f"{minutes}m")
-            if secs > 0 or not parts: parts.append(f"{secs}s")
-            result = " ".join(parts)
-        elif style == "minimal":
-            if days > 0: result = f"{days}:{hours:02d}:{minutes:02d}:{secs:02d}"
-            elif hours > 0: result = f"{hours}:{minutes:02d}:{secs:02d}"
-            else: result = f"{minutes}:{secs:02d}"
-        else:
-            raise ValueError(f"Invalid style: {style}")
+        # int() raises on inf/nan here, before anything reaches the cache
+        result = _format_duration_cached(int(abs_seconds), style)
         
         return f"-{result}" if is_negative else result
         
-    except (ValueError, TypeError) as e:
+    except (ValueError, TypeError, OverflowError) as e:
         return f"Error: Invalid input. Seconds must be a number. {str(e)}"
     except Exception as e:
         return f"Error formatting duration: {str(e)}"
 
+# mcp.tool() may wrap functions in Tool objects; dispatch to the plain callables
+_BATCH_TOOLS = {
+    fn.__name__: fn
+    for fn in (
+        getattr(tool, "fn", tool)
+        for tool in (current_datetime, time_difference, time_difference_batch, time_since,
+                     parse_timestamp, add_time, timestamp_context, format_duration)
+    )
+}
+_BATCH_MAX_OPS = 20
+
+@mcp.tool()
+def batch(ops: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Run several time tools in a single call, in order.
+    
+    Args:
+        ops: Up to 20 operations, each of the form {"tool": name, "args": {...}}.
+            Example: [{"tool": "current_datetime", "args": {"timezone": "UTC"}},
+                      {"tool": "time_since", "args": {"timestamp": "2024-01-15 09:00:00"}}]
+    
+    Returns:
+        One entry per operation, in the same order:
+        - {"tool": name, "result": <what the tool returns>}, or
+        - {"tool": name, "error": message} if the operation could not be run
+        If more than 20 operations are given, none are run and the only entry
+        is {"tool": None, "error": message}.
+    """
+    if len(ops) > _BATCH_MAX_OPS:
+        return [{ "tool": None, "error": f"Too many operations: {len(ops)} (maximum is {_BATCH_MAX_OPS})" }]
+    
+    results = []
+    for op in ops:
+        name = op.get("tool") if isinstance(op, dict) else None
+        fn = _BATCH_TOOLS.get(name) if isinstance(name, str) else None
+        if fn is None:
+            results.append({ "tool": name, "error": f"Unknown tool: {name!r}" })
+            continue
+        
+        try:
+            results.append({ "tool": name, "result": fn(**(op.get("args") or {})) })
+        except TypeError as e:
+            results.append({ "tool": name, "error": f"Invalid arguments: {str(e)}" })
+    
+    return results
+
 if __name__ == "__main__":
     import asyncio
     port = int(os.environ.get("PORT", 8000))
@@ -470,9 +773,10 @@ if __name__ == "__main__":
         print("WARNING: Authentication is DISABLED. Server is open.")
         
     asyncio.run(
-        mcp.run_sse_async(
+        mcp.run_http_async(
+            transport="sse",
             host="0.0.0.0", 
             port=port,
-            log_level="debug"
+            log_level=os.environ.get("LOG_LEVEL", "info")
         )
     )
@@ -1,9 +1,10 @@
 import pytest
 from datetime import datetime, timedelta
-import pytz
+from zoneinfo import ZoneInfo
 from unittest.mock import patch, MagicMock
 import sys
 import os
+import asyncio
 
 # Import the actual implementation without mocking FastMCP
 # We'll extract the raw functions from the decorated versions
@@ -21,6 +22,14 @@ class MockFastMCP:
     
     def run_sse_async(self, **kwargs):
         pass
+    
+    # Stand-ins for the app factories AuthenticatedFastMCP wraps; they return
+    # the middleware list they were given so tests can inspect it
+    def http_app(self, path=None, middleware=None, **kwargs):
+        return middleware
+    
+    def sse_app(self, path=None, message_path=None, middleware=None):
+        return middleware
 
 # Replace fastmcp with our mock that preserves function behavior
 sys.modules['fastmcp'] = MagicMock()
@@ -31,13 +40,41 @@ sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 import passage_of_time_mcp
 
 # Extract the actual functions
+parse_standard_timestamp = passage_of_time_mcp.parse_standard_timestamp
 current_datetime = passage_of_time_mcp.current_datetime
 time_difference = passage_of_time_mcp.time_difference
+time_difference_batch = passage_of_time_mcp.time_difference_batch
 time_since = passage_of_time_mcp.time_since
 parse_timestamp = passage_of_time_mcp.parse_timestamp
 add_time = passage_of_time_mcp.add_time
 timestamp_context = passage_of_time_mcp.timestamp_context
 format_duration = passage_of_time_mcp.format_duration
+batch = passage_of_time_mcp.batch
+ApiKeyMiddleware = passage_of_time_mcp.ApiKeyMiddleware
+
+
+class TestParseStandardTimestamp:
+    def test_repeated_timestamp_is_cached(self):
+        first = parse_standard_timestamp("2024-01-15 14:30:00", "UTC")
+        # Surrounding whitespace is stripped before the cache lookup
+        second = parse_standard_timestamp("  2024-01-15 14:30:00 ", "UTC")
+        assert first is second
+        
+    def test_date_only(self):
+        result = parse_standard_timestamp("2024-01-15", "UTC")
+        assert (result.year, result.month, result.day, result.hour) == (2024, 1, 15, 0)
+        
+    def test_trailing_timezone_abbreviation(self):
+        result = parse_standard_timestamp("2024-01-15 14:30:00 EST", "America/New_York")
+        assert (result.hour, result.minute) == (14, 30)
+        
+    def test_unpadded_fields_still_accepted(self):
+        result = parse_standard_timestamp("2024-1-5 9:05:00", "UTC")
+        assert (result.month, result.day, result.hour) == (1, 5, 9)
+        
+    def test_out_of_range_field(self):
+        with pytest.raises(ValueError, match="Invalid timestamp format"):
+            parse_standard_timestamp("2024-02-30", "UTC")
 
 
 class TestCurrentDatetime:
@@ -57,6 +94,22 @@ class TestCurrentDatetime:
     def test_invalid_timezone(self):
         result = current_datetime("Invalid/Timezone")
         assert "Error: Unknown timezone" in result
+        
+    @patch('passage_of_time_mcp.time')
+    def test_reuses_result_within_same_second(self, mock_time):
+        mock_time.time.return_value = 1705343445.2
+        first = current_datetime("America/New_York")
+        assert first == "2024-01-15 13:30:45 EST"
+        
+        mock_time.time.return_value = 1705343445.9
+        assert current_datetime("America/New_York") is first
+        
+        mock_time.time.return_value = 1705343446.0
+        assert current_datetime("America/New_York") == "2024-01-15 13:30:46 EST"
+        
+    def test_timezone_name_case_insensitive(self):
+        result = current_datetime("utc")
+        assert "UTC" in result
 
 
 class TestTimeDifference:
@@ -124,12 +177,62 @@ class TestTimeDifference:
         assert "Invalid timestamp format" in result["error"]
         assert "YYYY-MM-DD HH:MM:SS" in result["error"]
         
+    def test_across_dst_change(self):
+        # Clocks sprang forward on 2024-03-10 in New York, so that day had 23 hours
+        result = time_difference(
+            "2024-03-09 12:00:00",
+            "2024-03-10 12:00:00",
+            timezone="America/New_York"
+        )
+        assert result["seconds"] == 82800
+        
     def test_error_handling(self):
         result = time_difference(
             "invalid date",
             "2024-01-01"
         )
         assert "error" in result
+        
+    def test_identical_timestamps(self):
+        result = time_difference("2024-01-01 10:00:00", "2024-01-01 10:00:00", unit="hours")
+        assert result == { "seconds": 0, "formatted": "0 seconds", "is_negative": False, "requested_unit": 0 }
+        
+        # Identical but invalid input is still rejected
+        assert "error" in time_difference("invalid date", "invalid date")
+
+    def test_weeks_unit_rejected(self):
+        # "weeks" is an add_time unit only, on both the full and identical-timestamp paths
+        assert "error" in time_difference("2024-01-01", "2024-01-15", unit="weeks")
+        assert "error" in time_difference("2024-01-01", "2024-01-01", unit="weeks")
+
+
+class TestTimeDifferenceBatch:
+    def test_pairwise_seconds(self):
+        result = time_difference_batch(
+            ["2024-01-15 10:00:00", "2024-03-09 12:00:00", "2024-01-02"],
+            ["2024-01-15 13:30:00", "2024-03-10 12:00:00", "2024-01-01"],
+            timezone="America/New_York"
+        )
+        assert result == { "seconds": [12600, 82800, -86400] }
+        
+    def test_matches_time_difference(self):
+        pairs = [("2024-01-01 00:00:00", "2024-12-31 23:59:59"), ("2024-06-01", "2024-01-01")]
+        result = time_difference_batch([a for a, _ in pairs], [b for _, b in pairs])
+        assert result["seconds"] == [time_difference(a, b)["seconds"] for a, b in pairs]
+        
+    def test_length_mismatch(self):
+        result = time_difference_batch(["2024-01-01"], [])
+        assert "differ in length" in result["error"]
+        assert result["seconds"] == []
+            
+    def test_too_many_pairs(self):
+        result = time_difference_batch(["2024-01-01"] * 1001, ["2024-01-02"] * 1001)
+        assert "Too many timestamp pairs" in result["error"]
+        
+    def test_invalid_timestamp(self):
+        result = time_difference_batch(["2024-01-01"], ["not a date"])
+        assert "Invalid timestamp format" in result["error"]
+        assert result["seconds"] == []
 
 
 class TestTimeSince:
@@ -139,9 +242,10 @@ class TestTimeSince:
         real_datetime = datetime
         mock_datetime.now = MagicMock()
         mock_datetime.strptime = real_datetime.strptime
+        mock_datetime.side_effect = real_datetime
         
         # Set up the mock to return a specific time
-        tz = pytz.timezone("America/New_York")
+        tz = ZoneInfo("America/New_York")
         mock_now = real_datetime(2024, 1, 10, 15, 0, 0, tzinfo=tz)
         mock_datetime.now.return_value = mock_now
         
@@ -156,8 +260,9 @@ class TestTimeSince:
         real_datetime = datetime
         mock_datetime.now = MagicMock()
         mock_datetime.strptime = real_datetime.strptime
+        mock_datetime.side_effect = real_datetime
         
-        tz = pytz.timezone("America/New_York")
+        tz = ZoneInfo("America/New_York")
         mock_now = real_datetime(2024, 1, 10, 15, 0, 0, tzinfo=tz)
         mock_datetime.now.return_value = mock_now
         
@@ -169,8 +274,9 @@ class TestTimeSince:
         real_datetime = datetime
         mock_datetime.now = MagicMock()
         mock_datetime.strptime = real_datetime.strptime
+        mock_datetime.side_effect = real_datetime
         
-        tz = pytz.timezone("America/New_York")
+        tz = ZoneInfo("America/New_York")
         mock_now = real_datetime(2024, 1, 10, 15, 0, 0, tzinfo=tz)
         mock_datetime.now.return_value = mock_now
         
@@ -250,11 +356,17 @@ class TestAddTime:
         
         mock_datetime.now = mock_now
         mock_datetime.strptime = real_datetime.strptime
+        mock_datetime.side_effect = real_datetime
         
         result = add_time("2024-01-15 14:00:00", 1, "days")
         assert isinstance(result["description"], str)
         assert "tomorrow" in result["description"].lower()
         
+    def test_add_days_across_dst_change(self):
+        result = add_time("2024-03-09 12:00:00", 1, "days", timezone="America/New_York")
+        assert result["result"] == "2024-03-10 12:00:00"
+        assert result["iso"] == "2024-03-10T12:00:00-04:00"
+        
     def test_add_weeks(self):
         result = add_time("2024-01-01", 2, "weeks")
         assert "2024-01-15" in result["result"]
@@ -263,6 +375,11 @@ class TestAddTime:
         result = add_time("invalid date", 1, "days")
         assert "error" in result
 
+    def test_invalid_unit(self):
+        result = add_time("2024-01-15", 1, "fortnights")
+        assert result["error"] == "Invalid unit: fortnights"
+        assert result["result"] == "Error"
+
 
 class TestTimestampContext:
     def test_morning_context(self):
@@ -304,6 +421,7 @@ class TestTimestampContext:
         
         mock_datetime.now = mock_now
         mock_datetime.strptime = real_datetime.strptime
+        mock_datetime.side_effect = real_datetime
         
         result = timestamp_context("2024-01-15 10:00:00")
         assert result["relative_day"] == "today"
@@ -359,6 +477,110 @@ class TestFormatDuration:
         result = format_duration("not a number")
         assert "Error" in result
         assert "must be a number" in result
+        
+    def test_sign_applied_outside_cache(self):
+        assert format_duration(3600.4, "compact") == "1h"
+        assert format_duration(-3600, "compact") == "-1h"
+        assert format_duration(3600, "compact") == "1h"
+        
+    def test_non_finite_input(self):
+        assert "must be a number" in format_duration(float("inf"))
+        assert "must be a number" in format_duration(float("nan"))
+
+
+class TestBatch:
+    def test_runs_operations_in_order(self):
+        result = batch([
+            {"tool": "format_duration", "args": {"seconds": 3665, "style": "minimal"}},
+            {"tool": "time_difference", "args": {"timestamp1": "2024-01-01", "timestamp2": "2024-01-05"}},
+        ])
+        assert result[0] == {"tool": "format_duration", "result": "1:01:05"}
+        assert result[1]["tool"] == "time_difference"
+        assert result[1]["result"]["seconds"] == 345600
+        
+    def test_includes_time_difference_batch(self):
+        result = batch([{"tool": "time_difference_batch",
+                         "args": {"timestamps1": ["2024-01-01"], "timestamps2": ["2024-01-02"]}}])
+        assert result[0] == {"tool": "time_difference_batch", "result": {"seconds": [86400]}}
+        
+    def test_unknown_tool(self):
+        result = batch([{"tool": "batch", "args": {}}])
+        assert "Unknown tool" in result[0]["error"]
+        
+    def test_invalid_arguments(self):
+        result = batch([{"tool": "add_time", "args": {"when": "2024-01-01"}}])
+        assert "Invalid arguments" in result[0]["error"]
+        
+    def test_too_many_operations(self):
+        result = batch([{"tool": "current_datetime"}] * 21)
+        assert len(result) == 1
+        assert result[0]["tool"] is None
+        assert "Too many operations" in result[0]["error"]
+
+
+class TestApiKeyMiddleware:
+    def _call(self, api_key, headers):
+        downstream = MagicMock()
+        sent = []
+        
+        async def app(scope, receive, send):
+            downstream(scope)
+        
+        async def send(message):
+            sent.append(message)
+        
+        scope = {"type": "http", "headers": headers}
+        asyncio.run(ApiKeyMiddleware(app, api_key=api_key)(scope, None, send))
+        return downstream, sent
+        
+    def test_matching_key_passes_through(self):
+        downstream, sent = self._call("secret", [(b"x-api-key", b"secret")])
+        downstream.assert_called_once()
+        assert sent == []
+        
+    def test_missing_key_rejected(self):
+        downstream, sent = self._call("secret", [(b"accept", b"*/*")])
+        downstream.assert_not_called()
+        assert sent[0]["status"] == 401
+        
+    def test_wrong_key_rejected(self):
+        downstream, sent = self._call("secret", [(b"x-api-key", b"guess")])
+        downstream.assert_not_called()
+        assert sent[0]["status"] == 401
+        
+    def test_non_http_scope_passes_through(self):
+        downstream = MagicMock()
+        
+        async def app(scope, receive, send):
+            downstream(scope)
+        
+        asyncio.run(ApiKeyMiddleware(app, api_key="secret")({"type": "lifespan"}, None, None))
+        downstream.assert_called_once()
+        
+    @patch('passage_of_time_mcp.API_KEY', "secret")
+    def test_installed_ahead_of_caller_middleware(self):
+        # AuthenticatedFastMCP runs every HTTP app's middleware list through this
+        extra = MagicMock()
+        middleware = passage_of_time_mcp._with_api_key([extra])
+        assert middleware[0].cls is ApiKeyMiddleware
+        assert middleware[0].kwargs == {"api_key": "secret"}
+        assert middleware[1] is extra
+        
+    @patch('passage_of_time_mcp.API_KEY', None)
+    def test_not_installed_without_key(self):
+        assert passage_of_time_mcp._with_api_key(None) is None
+        
+    @patch('passage_of_time_mcp.API_KEY', "secret")
+    def test_server_apps_include_middleware(self):
+        extra = MagicMock()
+        for middleware in (
+            passage_of_time_mcp.mcp.http_app(),
+            passage_of_time_mcp.mcp.http_app(transport="sse", middleware=[extra]),
+            passage_of_time_mcp.mcp.sse_app(),
+        ):
+            assert middleware[0].cls is ApiKeyMiddleware
+            assert middleware[0].kwargs == {"api_key": "secret"}
+        assert passage_of_time_mcp.mcp.http_app(middleware=[extra])[1] is extra
 
 
 # Integration tests